@@ -25,17 +25,17 @@ done    halt               # stop simulation
 five    .fill 5
 neg1    .fill -1
 
-Алгоритм: два проходи — (1) збір міток; (2) кодування інструкцій / директив
-`.fill` у 32‑бітові слова, записані десятковими числами по одному на рядок.
+Алгоритм: один прохід — кодування інструкцій / директив `.fill` у 32‑бітові
+слова (десяткові, по одному на рядок); посилання на мітки записуються як
+fixup-и й підставляються в кінці, коли відомі всі мітки.
 """
 from __future__ import annotations
 
 import argparse
-import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 # ────────────────────────────────────────────────────────────────────────────
 # Constants & helpers
@@ -52,13 +52,15 @@ OPCODES: Dict[str, int] = {
     "noop": 7,  # O‑type
 }
 
-LABEL_RE = re.compile(r"^[A-Za-z][A-Za-z0-9]{0,5}$")
-TOKEN_RE = re.compile(r"[^\s]+")  # split by runs of space / tab
-
 MAX_16 = 1 << 16
 MASK_32 = 0xFFFFFFFF
 
 
+def is_label(token: str) -> bool:
+    """Label = letter followed by up to 5 letters/digits (ASCII only)."""
+    return len(token) <= 6 and token.isascii() and token[0].isalpha() and token.isalnum()
+
+
 def sign_extend_16(value: int) -> int:
     """Return *value* treated as signed 16‑bit integer promoted to Python int."""
     value &= 0xFFFF
@@ -79,55 +81,67 @@ class Line:
 
 
 # ────────────────────────────────────────────────────────────────────────────
-# Pass 1 – parsing & symbol table
+# Parsing
 # ────────────────────────────────────────────────────────────────────────────
 
-def parse_lines(text: str) -> List[Line]:
-    """Parse *text* into a list of *Line* objects (ignores blank & comment lines)."""
-    lines: List[Line] = []
+def parse_lines(text: str) -> Iterator[Line]:
+    """Yield *Line* objects parsed from *text* (ignores blank & comment lines)."""
     for idx, raw in enumerate(text.splitlines()):
-        code = raw.split('#', 1)[0]  # strip inline comment
+        code = raw.partition('#')[0] if '#' in raw else raw  # strip inline comment
         if not code.strip():
             continue
-        tokens = TOKEN_RE.findall(code)
+        tokens = code.split()  # split by runs of space / tab
         label: str | None = None
         op_idx = 0
         # First token = label only if it is NOT an opcode or .fill
-        if LABEL_RE.match(tokens[0]) and tokens[0] not in OPCODES and tokens[0] != ".fill":
+        if is_label(tokens[0]) and tokens[0] not in OPCODES and tokens[0] != ".fill":
             label = tokens[0]
             op_idx = 1
         if op_idx >= len(tokens):
             raise AsmError(idx, "Missing opcode", raw)
         opcode = tokens[op_idx]
         args = tuple(tokens[op_idx + 1 :])
-        lines.append(Line(idx, label, opcode, args, raw))
-    return lines
+        yield Line(idx, label, opcode, args, raw)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Assembly – single pass, label operands patched via fixups
+# ────────────────────────────────────────────────────────────────────────────
+
+# Encoded words of lines that reference no labels, keyed by (opcode, args):
+# such words do not depend on pc or on the symbol table.
+_ENC_CACHE: Dict[Tuple[str, Tuple[str, ...]], int] = {}
 
 
-def build_symbol_table(lines: List[Line]) -> Dict[str, int]:
+def assemble(text: str) -> List[int]:
+    """Assemble *text* into machine words in one pass over the source.
+
+    Label operands (forward or backward) leave the 16‑bit offset field empty
+    and are recorded as fixups ``(pc, label, line)``; they are patched once
+    every label is known.
+    """
+    code: List[int] = []
     symbols: Dict[str, int] = {}
-    for pc, line in enumerate(lines):
+    fixups: List[Tuple[int, str, Line]] = []
+    for pc, line in enumerate(parse_lines(text)):
         if line.label is not None:
             if line.label in symbols:
                 raise AsmError(line.lineno, f"Duplicate label '{line.label}'", line.raw)
             symbols[line.label] = pc
-    return symbols
 
-
-# ────────────────────────────────────────────────────────────────────────────
-# Pass 2 – encoding
-# ────────────────────────────────────────────────────────────────────────────
-
-def encode(lines: List[Line], symbols: Dict[str, int]) -> List[int]:
-    code: List[int] = []
-    for pc, line in enumerate(lines):
         op = line.opcode
         args = line.args
 
+        key = (op, args)
+        if key in _ENC_CACHE:
+            code.append(_ENC_CACHE[key])
+            continue
+
         # ----- директива .fill ------------------------------------------------
         if op == ".fill":
             check_argc(line, 1)
-            code.append(resolve_value(args[0], symbols))
+            _ENC_CACHE[key] = word = resolve_value(args[0], symbols)
+            code.append(word)
             continue
 
         # ----- валідація опкоду ----------------------------------------------
@@ -141,30 +155,19 @@ def encode(lines: List[Line], symbols: Dict[str, int]) -> List[int]:
             rA, rB, rD = map(int_reg, args)
             instr = (opc_val << 22) | (rA << 19) | (rB << 16) | rD
 
-        # ----- I-формат: lw / sw ---------------------------------------------
-        elif op in {"lw", "sw"}:             # op rA rB offset
+        # ----- I-формат: lw / sw / beq ---------------------------------------
+        elif op in {"lw", "sw", "beq"}:      # op rA rB offset/label
             check_argc(line, 3)
             rA, rB = map(int_reg, args[:2])
-            offset = resolve_value(args[2], symbols, allow_label=True)
-
-            if not (-MAX_16 // 2 <= offset < MAX_16 // 2):
-                raise AsmError(line.lineno, "offset out of 16-bit range", line.raw)
-            instr = (opc_val << 22) | (rA << 19) | (rB << 16) | (offset & 0xFFFF)
-
-        # ----- I-формат: beq --------------------------------------------------
-        elif op == "beq":                    # op rA rB label/imm
-            check_argc(line, 3)
-            rA, rB = map(int_reg, args[:2])
-
-            # якщо аргумент – мітка → обчислюємо Δ = target − (pc + 1)
-            if args[2] in symbols:
-                offset = symbols[args[2]] - (pc + 1)
-            else:
-                offset = resolve_value(args[2], symbols)
-
-            if not (-MAX_16 // 2 <= offset < MAX_16 // 2):
-                raise AsmError(line.lineno, "branch offset out of 16-bit range", line.raw)
-            instr = (opc_val << 22) | (rA << 19) | (rB << 16) | (offset & 0xFFFF)
+            instr = (opc_val << 22) | (rA << 19) | (rB << 16)
+            try:
+                offset = int(args[2])
+            except ValueError:               # мітка → підставимо після проходу
+                fixups.append((pc, args[2], line))
+                code.append(instr)
+                continue
+            check_offset(line, offset)
+            instr |= offset & 0xFFFF
 
         # ----- J-формат -------------------------------------------------------
         elif op == "jalr":                   # op rA rB
@@ -177,10 +180,24 @@ def encode(lines: List[Line], symbols: Dict[str, int]) -> List[int]:
             check_argc(line, 0)
             instr = opc_val << 22
 
-        code.append(instr & MASK_32)
+        _ENC_CACHE[key] = word = instr & MASK_32
+        code.append(word)
+
+    # ----- fixups: lw/sw → адреса мітки, beq → Δ = target − (pc + 1) ---------
+    for pc, label, line in fixups:
+        if label not in symbols:
+            raise AsmError(-1, f"Undefined symbol '{label}'")
+        offset = symbols[label]
+        if line.opcode == "beq":
+            offset -= pc + 1
+        check_offset(line, offset)
+        code[pc] |= offset & 0xFFFF
     return code
 
 
+assemble.clear_cache = _ENC_CACHE.clear  # type: ignore[attr-defined]
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # CLI / main entry
 # ────────────────────────────────────────────────────────────────────────────
@@ -201,11 +218,9 @@ def main(argv: List[str] | None = None) -> None:
         parser.error(f"Source file '{ns.source}' does not exist")
 
     text = ns.source.read_text(encoding="utf‑8")
-    lines = parse_lines(text)
-    symbols = build_symbol_table(lines)
-    words = encode(lines, symbols)
+    words = assemble(text)
 
-    ns.output.write_text("\n".join(str(w) for w in words) + "\n", encoding="utf‑8")
+    ns.output.write_text("\n".join(map(str, words)) + "\n", encoding="utf‑8")
     print(f"Assembled {len(words)} words → {ns.output}")
 
 
@@ -222,13 +237,22 @@ class AsmError(RuntimeError):
 
 def resolve_value(token: str, symbols: Dict[str, int], *, allow_label: bool = False) -> int:
     """Convert *token* to int, possibly resolving a label."""
-    if token.isdigit() or (token.startswith("-") and token[1:].isdigit()):
+    try:
         return int(token)
+    except ValueError:
+        pass
     if allow_label and token in symbols:
         return symbols[token]
     raise AsmError(-1, f"Undefined symbol '{token}'")
 
 
+def check_offset(line: Line, offset: int) -> None:
+    """Ensure lw/sw/beq *offset* fits into signed 16 bits."""
+    if not (-MAX_16 // 2 <= offset < MAX_16 // 2):
+        what = "branch offset" if line.opcode == "beq" else "offset"
+        raise AsmError(line.lineno, f"{what} out of 16-bit range", line.raw)
+
+
 def check_argc(line: Line, expected: int) -> None:
     """Ensure instruction *line* has exactly *expected* operands."""
     if len(line.args) != expected:
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+setup.py ─ необов'язкова збірка скомпільованого симулятора.
+
+▪ python setup.py build_ext --inplace   → simcore.*.so поруч із simulate.py
+▪ Потрібні Cython і C-компілятор; без них simulate.py працює на чистому Python
+▪ Якщо Cython немає, але є mypyc — AOT-компілюється сам simulate.py
+  (запуск: python -c "import simulate; simulate.main()" [аргументи CLI])
+"""
+
+import sys
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+    HAVE_CYTHON = True
+except ImportError:
+    HAVE_CYTHON = False
+
+if HAVE_CYTHON:
+    ext_modules = cythonize(
+        [Extension("simcore", ["simcore.pyx"],
+                   extra_compile_args=["-O3", "-march=native"])],
+        language_level=3,
+    )
+else:
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        sys.exit("Nothing to build: install Cython or mypy (mypyc); "
+                 "simulate.py runs without it.")
+    ext_modules = mypycify(["simulate.py"])
+
+setup(
+    name="lc2k-sim",
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,112 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+simcore.pyx ─ необов'язкове скомпільоване ядро симулятора LC-2K.
+
+▪ Збірка:  python setup.py build_ext --inplace
+▪ simulate.py підхоплює модуль автоматично; без нього працює чистий Python
+▪ Семантика інструкцій 1:1 з simulate.py (r0 ≡ 0, адреси по модулю 64 K)
+"""
+
+from array import array
+from libc.string cimport memcpy, memset
+
+cdef enum:
+    MEM_SIZE  = 1 << 16             # 65 536 слів
+    ADDR_MASK = MEM_SIZE - 1
+
+# ── helpers ─────────────────────────────────────────────────────
+cdef inline int sext16(unsigned int x) nogil:
+    return <int>(x & 0x7FFF) - <int>(x & 0x8000)
+
+# ── state ───────────────────────────────────────────────────────
+cdef class CState:
+    cdef unsigned int mem[MEM_SIZE]
+    cdef unsigned int reg[8]
+    cdef public Py_ssize_t pc, steps
+
+    def __cinit__(self):
+        memset(self.mem, 0, sizeof(self.mem))
+        memset(self.reg, 0, sizeof(self.reg))
+
+    def __init__(self, const unsigned int[::1] words, Py_ssize_t pc=0, Py_ssize_t steps=0):
+        cdef Py_ssize_t n = min(words.shape[0], MEM_SIZE)
+        if n:
+            memcpy(self.mem, &words[0], n * sizeof(unsigned int))
+        self.pc, self.steps = pc, steps
+
+    def registers(self) -> list:
+        return [self.reg[i] for i in range(8)]
+
+    def memory(self) -> array:
+        return array("I", (<char*>self.mem)[:sizeof(self.mem)])
+
+    def nonzero(self) -> list:
+        """Адреси ненульових слів (для dump_memory)."""
+        cdef Py_ssize_t i
+        return [i for i in range(MEM_SIZE) if self.mem[i]]
+
+# ── single step (1 → далі, 0 → halt) ────────────────────────────
+cdef inline int _step(unsigned int* mem, unsigned int* reg, Py_ssize_t* pc) nogil:
+    cdef unsigned int word = mem[pc[0]]
+    cdef unsigned int op   = (word >> 22) & 7
+    cdef unsigned int a    = (word >> 19) & 7
+    cdef unsigned int b    = (word >> 16) & 7
+    cdef unsigned int imm  =  word & 0xFFFF
+    cdef unsigned int dst  =  word & 7
+    cdef Py_ssize_t next_pc = pc[0] + 1
+
+    if op == 0:                                     # add  (mod 2³²)
+        reg[dst] = reg[a] + reg[b]
+    elif op == 1:                                   # nand
+        reg[dst] = ~(reg[a] & reg[b])
+    elif op == 2:                                   # lw
+        reg[b] = mem[(reg[a] + sext16(imm)) & ADDR_MASK]
+    elif op == 3:                                   # sw
+        mem[(reg[a] + sext16(imm)) & ADDR_MASK] = reg[b]
+    elif op == 4:                                   # beq
+        if reg[a] == reg[b]:
+            next_pc += sext16(imm)
+    elif op == 5:                                   # jalr
+        reg[b] = <unsigned int>next_pc
+        next_pc = reg[a]
+    elif op == 6:                                   # halt
+        return 0
+    # op == 7: noop
+
+    pc[0] = next_pc & ADDR_MASK
+    reg[0] = 0
+    return 1
+
+# ── main loop ───────────────────────────────────────────────────
+cpdef int run(CState s, object hook, Py_ssize_t limit) except -1:
+    """Виконувати до halt (→ 1) або до перевищення *limit* кроків (→ 0).
+
+    *hook(pc, regs)* викликається перед кожною інструкцією (покроковий лог);
+    з hook=None цикл іде без GIL.
+    """
+    cdef unsigned int* mem = s.mem
+    cdef unsigned int* reg = s.reg
+    cdef Py_ssize_t pc = s.pc, steps = s.steps
+    cdef int halted = 0
+
+    if hook is None:
+        with nogil:
+            while True:
+                if not _step(mem, reg, &pc):
+                    halted = 1
+                    break
+                steps += 1
+                if steps > limit:
+                    break
+    else:
+        while True:
+            hook(pc, s.reg)
+            if not _step(mem, reg, &pc):
+                halted = 1
+                break
+            steps += 1
+            if steps > limit:
+                break
+
+    s.pc, s.steps = pc, steps
+    return halted
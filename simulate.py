@@ -5,17 +5,30 @@ simulate.py ─ мінімальний симулятор LC-2K (8 інстру
 ▪ Якщо запустити без аргументів, виконує ./output.mc
 ▪ Увесь лог дублюється в result.txt
 ▪ --quiet прибирає покроковий друк на консоль (але лишає його в файлі)
+▪ --no-trace-log прибирає покроковий дамп регістрів узагалі (і з файлу);
+  фінальний стан після halt записується як завжди
+▪ Якщо зібрано simcore (python setup.py build_ext --inplace), цикл
+  виконання йде в скомпільованому ядрі; інакше — чистий Python
 """
 
 from __future__ import annotations
-import argparse, sys, io
+import argparse, os, sys
+from array import array
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, NoReturn
+
+try:                                    # необов'язкове ядро на Cython
+    import simcore                      # type: ignore[import-not-found]
+except ImportError:
+    simcore = None
 
 MEM_SIZE   = 1 << 16        # 65 536 слів
 STEP_LIMIT = 1_000_000
 MASK_32    = 0xFFFF_FFFF
+ADDR_MASK  = MEM_SIZE - 1       # 0xFFFF: адреси й pc по модулю 64 K
 LOG_FILE   = Path("result.txt")
+LOG_CHUNK  = 1 << 20            # байтів логу між записами у файл
 
 # ── ISA ──────────────────────────────────────────────────────────
 OP_ADD, OP_NAND, OP_LW, OP_SW, OP_BEQ, OP_JALR, OP_HALT, OP_NOOP = range(8)
@@ -25,109 +38,214 @@ def sext16(x: int) -> int:
     """Sign-extend 16-bit value to Python int (-32768…32767)."""
     return (x & 0x7FFF) - (x & 0x8000)
 
-def load_mc(path: str) -> list[int]:
-    with open(path, encoding="utf-8") as f:
-        words = [int(line) & MASK_32 for line in f]
-    if len(words) > MEM_SIZE:
-        sys.exit(f"Program too big: {len(words)} > {MEM_SIZE}")
-    return words + [0] * (MEM_SIZE - len(words))
+_DUMP_FMT = "pc:%d  r0:%d r1:%d r2:%d r3:%d r4:%d r5:%d r6:%d r7:%d"
+
+def fmt_regs(pc: int, reg: list[int]) -> str:
+    return _DUMP_FMT % (pc, reg[0], reg[1], reg[2], reg[3],
+                            reg[4], reg[5], reg[6], reg[7])
+
+def load_mc(path: str) -> tuple[array[int], set[int]]:
+    """Пам'ять — суцільний буфер 32-бітових слів ('I'), а не список PyLong.
+
+    Другим значенням повертає адреси ненульових слів образу програми.
+    """
+    tokens = Path(path).read_bytes().split()   # один read, без TextIO-декодування
+    if len(tokens) > MEM_SIZE:
+        sys.exit(f"Program too big: {len(tokens)} > {MEM_SIZE}")
+    mem = array("I", [0]) * MEM_SIZE
+    words = array("I", [int(t) & MASK_32 for t in tokens])
+    mem[:len(words)] = words
+    return mem, {i for i, w in enumerate(words) if w}
 
 # ── state ───────────────────────────────────────────────────────
 @dataclass(slots=True)
 class State:
-    mem:  list[int]
-    log:  io.TextIOBase
+    mem:  array[int]
+    log_fd:int                                    # result.txt, os.open()
     reg:  list[int] = field(default_factory=lambda: [0] * 8)
     pc:   int = 0
     steps:int = 0
     trace:bool = True
+    log_trace:bool = True                         # покроковий дамп регістрів
+    dirty:set[int] = field(default_factory=set)   # адреси, що можуть бути ≠0
+    _buf: bytearray = field(default_factory=bytearray, init=False)
 
     def _out(self, msg: str) -> None:
-        self.log.write(msg + "\n")
+        buf = self._buf
+        buf += msg.encode()
+        buf.append(10)                             # b"\n"
         if self.trace:
             print(msg)
+        if len(buf) >= LOG_CHUNK:
+            self._flush()
+
+    def _flush(self) -> None:
+        buf = self._buf
+        while buf:                                 # os.write може записати частково
+            del buf[:os.write(self.log_fd, buf)]
+
+    def close(self) -> None:
+        """Дописати буфер і закрити лог; повторний виклик нічого не робить."""
+        if self.log_fd < 0:
+            return
+        self._flush()
+        os.close(self.log_fd)
+        self.log_fd = -1
 
     def dump(self) -> None:
-        regs = " ".join(f"r{i}:{self.reg[i]}" for i in range(8))
-        self._out(f"pc:{self.pc}  {regs}")
-
-# ── handlers (True → pc+1) ──────────────────────────────────────
-def op_add (s,a,b,dst,*_): s.reg[dst] = (s.reg[a] +  s.reg[b]) & MASK_32; return True
-def op_nand(s,a,b,dst,*_): s.reg[dst] = ~(s.reg[a] & s.reg[b]) & MASK_32; return True
-
-def op_lw(s,a,b,off,*_):
-    s.reg[b] = s.mem[(s.reg[a] + sext16(off)) & (MEM_SIZE - 1)]; return True
-
-def op_sw(s,a,b,off,*_):
-    s.mem[(s.reg[a] + sext16(off)) & (MEM_SIZE - 1)] = s.reg[b] & MASK_32; return True
-
-def op_beq(s,a,b,off,*_):
-    if s.reg[a] == s.reg[b]:
-        s.pc = (s.pc + 1 + sext16(off)) & (MEM_SIZE - 1); return False
-    return True
-
-def op_jalr(s,a,b,*_):
-    s.reg[b] = (s.pc + 1) & MASK_32
-    s.pc = s.reg[a] & (MEM_SIZE - 1);                     return False
+        self._out(fmt_regs(self.pc, self.reg))
 
 # ── нова утиліта для друку пам’яті ──────────────────────────────
 def dump_memory(s: State) -> None:
-    """Вивести всі слова пам’яті ≠0 (адреса: значення)."""
-    for addr, val in enumerate(s.mem):
+    """Вивести всі слова пам’яті ≠0 (адреса: значення).
+
+    Переглядає лише s.dirty (образ програми + адреси sw), а не всі 64 K слів.
+    """
+    mem = s.mem
+    for addr in sorted(s.dirty):
+        val = mem[addr]
         if val != 0:
             s._out(f"mem[{addr}] = {val}")
 
-def op_halt(s,*_):
+def halt(s: State) -> NoReturn:
     s._out("machine halted")
     s._out(f"instructions executed: {s.steps}")
     s.dump()
     s._out("--- memory state ---")
     dump_memory(s)                       # ← новий виклик
-    s.log.close()
+    s.close()
     sys.exit(0)
 
-def op_noop(*_): return True
-
-HANDLERS = {
-    OP_ADD: op_add,  OP_NAND: op_nand, OP_LW: op_lw,  OP_SW: op_sw,
-    OP_BEQ: op_beq,  OP_JALR: op_jalr, OP_HALT: op_halt, OP_NOOP: op_noop,
-}
-
-# ── single step ─────────────────────────────────────────────────
-def step(s: State):
-    word = s.mem[s.pc]
-    op   = (word >> 22) & 0b111
-    a    = (word >> 19) & 0b111
-    b    = (word >> 16) & 0b111
-    imm  =  word & 0xFFFF
-    dst  =  word & 0b111
+def step_limit(s: State) -> NoReturn:
+    s._out(f"Step limit {STEP_LIMIT} exceeded")
+    s.close()
+    sys.exit(1)
+
+# ── basic blocks ────────────────────────────────────────────────
+# Код між переходами виконується блоками: слова від pc до beq/jalr/halt
+# (або до кінця пам'яті) розкодовуються один раз у кортежі
+# (pc, op, rA, rB, sext16(off), rD) і кешуються за стартовою адресою.
+def decode_block(mem: array[int], pc: int, _sext: Callable[[int], int] = sext16,
+                 _STOP: frozenset[int] = frozenset((OP_BEQ, OP_JALR, OP_HALT)),
+                 ) -> list[tuple[int, ...]]:
+    blk: list[tuple[int, ...]] = []
+    append = blk.append
+    for pc in range(pc, MEM_SIZE):
+        w  = mem[pc]
+        op = w >> 22 & 0b111
+        append((pc, op, w >> 19 & 0b111, w >> 16 & 0b111, _sext(w & 0xFFFF), w & 0b111))
+        if op in _STOP:
+            break
+    return blk
+
+def invalidate(blocks: dict[int, list[tuple[int, ...]]], code: list[int],
+               addr: int) -> None:
+    """sw у закешований код: викинути всі блоки, що покривають addr."""
+    for start, blk in list(blocks.items()):
+        if start <= addr <= blk[-1][0]:
+            del blocks[start]
+            for i in range(start, blk[-1][0] + 1):
+                code[i] -= 1
+
+# ── main loop ───────────────────────────────────────────────────
+# Уся ISA розгорнута прямо тут (без окремих обробників): гілки впорядковані
+# за частотою, опкоди — літерали OP_* (0…7). Константи прив'язані як
+# аргументи за замовчуванням, а стан — у локальні змінні (LOAD_FAST).
+def run(s: State, _M: int = ADDR_MASK, _MASK: int = MASK_32,
+        _LIMIT: int = STEP_LIMIT) -> NoReturn:
+    reg, mem, dirty = s.reg, s.mem, s.dirty
+    out, fmt = s._out, fmt_regs
+    blocks: dict[int, list[tuple[int, ...]]] = {}
+    code = [0] * MEM_SIZE                 # скільки блоків покриває адресу
+    pc, steps = s.pc, s.steps
+    log_trace = s.log_trace
 
-    s.dump()
-    advance = HANDLERS[op](s, a, b, imm, dst)
-    if advance:
-        s.pc = (s.pc + 1) & (MEM_SIZE - 1)
-    s.reg[0] = 0
-    s.steps += 1
-    if s.steps > STEP_LIMIT:
-        s._out(f"Step limit {STEP_LIMIT} exceeded")
-        s.log.close()
-        sys.exit(1)
+    while True:
+        blk = blocks.get(pc)
+        if blk is None:
+            blk = blocks[pc] = decode_block(mem, pc)
+            for i in range(pc, blk[-1][0] + 1):
+                code[i] += 1
+        nxt = (blk[-1][0] + 1) & _M
+
+        for pc, op, a, b, off, dst in blk:
+            if log_trace:
+                out(fmt(pc, reg))
+            if op == 0:                                 # OP_ADD
+                reg[dst] = (reg[a] + reg[b]) & _MASK
+                reg[0] = 0
+            elif op == 4:                               # OP_BEQ
+                if reg[a] == reg[b]:
+                    nxt = (pc + 1 + off) & _M
+            elif op == 2:                               # OP_LW
+                reg[b] = mem[(reg[a] + off) & _M]
+                reg[0] = 0
+            elif op == 3:                               # OP_SW
+                addr = (reg[a] + off) & _M
+                mem[addr] = reg[b] & _MASK
+                dirty.add(addr)
+                if code[addr]:                          # самомодифікація коду
+                    invalidate(blocks, code, addr)
+                    # запис у поточний блок (навіть до pc) викидає його з
+                    # кешу — далі не доганяємо старий блок, а декодуємо з pc+1
+                    if blk[0][0] <= addr <= blk[-1][0]:
+                        blk.clear()
+                        nxt = (pc + 1) & _M
+            elif op == 1:                               # OP_NAND
+                reg[dst] = ~(reg[a] & reg[b]) & _MASK
+                reg[0] = 0
+            elif op == 5:                               # OP_JALR
+                reg[b] = pc + 1
+                nxt = reg[a] & _M
+                reg[0] = 0
+            elif op == 6:                               # OP_HALT
+                s.pc, s.steps = pc, steps
+                halt(s)
+            # OP_NOOP (7): нічого
+            steps += 1
+            if steps > _LIMIT:
+                s.pc, s.steps = nxt, steps
+                step_limit(s)
+        pc = nxt
+
+# ── compiled core ───────────────────────────────────────────────
+def run_native(s: State) -> NoReturn:
+    """Прогнати програму в simcore; фінальний звіт — спільний з Python-версією."""
+    core = simcore.CState(s.mem, s.pc, s.steps)
+    hook = (lambda pc, reg: s._out(fmt_regs(pc, reg))) if s.log_trace else None
+    halted = simcore.run(core, hook, STEP_LIMIT)
+    s.mem, s.reg = core.memory(), core.registers()
+    s.pc, s.steps = core.pc, core.steps
+    s.dirty = set(core.nonzero())
+    if halted:
+        halt(s)
+    step_limit(s)
 
 # ── cli ─────────────────────────────────────────────────────────
-def main():
+def main() -> None:
     p = argparse.ArgumentParser(description="LC-2K simulator → result.txt")
     p.add_argument("program", nargs="?", default="output.mc",
                    help="machine-code file (default: output.mc)")
     p.add_argument("--quiet", action="store_true",
                    help="suppress per-step console output (still logged)")
+    p.add_argument("--no-trace-log", action="store_true",
+                   help="skip per-step register dumps entirely "
+                        "(final state is still logged)")
     ns = p.parse_args()
 
-    log_fh = LOG_FILE.open("w", encoding="utf-8")
-    state  = State(mem=load_mc(ns.program),
-                   log=log_fh,
-                   trace=not ns.quiet)
-    while True:
-        step(state)
+    mem, dirty = load_mc(ns.program)
+    log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    state  = State(mem=mem,
+                   log_fd=log_fd,
+                   dirty=dirty,
+                   trace=not ns.quiet,
+                   log_trace=not ns.no_trace_log)
+    try:                                 # Ctrl-C / виняток не губить буфер логу
+        if simcore is not None:
+            run_native(state)
+        run(state)
+    finally:
+        state.close()
 
 if __name__ == "__main__":
     main()
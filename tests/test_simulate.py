@@ -0,0 +1,92 @@
+"""Regression tests for simulate.run(): basic-block cache vs self-modifying code."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import asemble  # noqa: E402
+import simulate  # noqa: E402
+
+HALT = 6 << 22
+NOOP = 7 << 22
+
+
+def run_program(source: str, tmp_path: Path) -> list[str]:
+    """Assemble *source*, execute it with the pure-Python run(), return the log."""
+    words = asemble.assemble(source)
+    mc = tmp_path / "prog.mc"
+    mc.write_text("\n".join(map(str, words)) + "\n")
+    mem, dirty = simulate.load_mc(str(mc))
+    log = tmp_path / "result.txt"
+    fd = os.open(log, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    state = simulate.State(mem=mem, log_fd=fd, dirty=dirty, trace=False)
+    with pytest.raises(SystemExit) as exc:
+        simulate.run(state)
+    assert exc.value.code == 0
+    return log.read_text().splitlines()
+
+
+def final_state(lines: list[str]) -> tuple[str, str]:
+    i = lines.index("machine halted")
+    return lines[i + 1], lines[i + 2]
+
+
+def test_store_behind_pc_then_ahead_in_same_block(tmp_path):
+    # sw 0 2 1 invalidates the running block from an address < pc; the next
+    # sw patches tgt ahead of pc, which must then execute as halt.
+    lines = run_program(f"""
+        lw 0 1 haltw
+        lw 0 2 noopw
+        sw 0 2 1
+        sw 0 1 tgt
+        noop
+tgt     noop
+        lw 0 3 seven
+        halt
+haltw   .fill {HALT}
+noopw   .fill {NOOP}
+seven   .fill 7
+""", tmp_path)
+    executed, regs = final_state(lines)
+    assert executed == "instructions executed: 5"
+    assert regs.startswith("pc:5 ") and " r3:0 " in regs
+
+
+def test_store_ahead_of_pc_in_same_block(tmp_path):
+    lines = run_program(f"""
+        lw 0 1 haltw
+        sw 0 1 tgt
+tgt     noop
+        lw 0 3 seven
+        halt
+haltw   .fill {HALT}
+seven   .fill 7
+""", tmp_path)
+    executed, regs = final_state(lines)
+    assert executed == "instructions executed: 2"
+    assert regs.startswith("pc:2 ") and " r3:0 " in regs
+
+
+def test_store_into_other_cached_block(tmp_path):
+    # First pass through the loop caches `loop`; the sw then rewrites tgt
+    # (add 3 1 3) so the second and third passes accumulate r1 into r3.
+    add_3_1_3 = (3 << 19) | (1 << 16) | 3
+    lines = run_program(f"""
+        lw 0 2 m1
+        lw 0 1 three
+loop    add 1 2 1
+tgt     noop
+        beq 1 0 done
+        lw 0 6 instr
+        sw 0 6 tgt
+        beq 0 0 loop
+done    halt
+m1      .fill -1
+three   .fill 3
+instr   .fill {add_3_1_3}
+""", tmp_path)
+    _, regs = final_state(lines)
+    assert " r3:1 " in regs